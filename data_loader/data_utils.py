@@ -1,8 +1,11 @@
 # -*- coding:utf-8 -*-
 
-import csv
+import os
+import tempfile
+import zipfile
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 
 from utils.math_utils import z_score
 
@@ -36,18 +39,20 @@ def seq_gen(data_seq, n_frame):
 
     Returns
     ----------
-    np.ndarray, shape is (length - n_frame + 1, n_frame, num_of_vertices, 1)
+    np.ndarray, read-only sliding window view on data_seq,
+                shape is (length - n_frame + 1, 1, n_frame, num_of_vertices)
 
     '''
 
-    data = np.zeros(shape=(data_seq.shape[0] - n_frame + 1,
-                           n_frame, data_seq.shape[1], 1))
-    for i in range(data_seq.shape[0] - n_frame + 1):
-        data[i, :, :, 0] = data_seq[i: i + n_frame, :]
-    return data
+    stride_t, stride_v = data_seq.strides
+    return as_strided(data_seq,
+                      shape=(data_seq.shape[0] - n_frame + 1,
+                             1, n_frame, data_seq.shape[1]),
+                      strides=(stride_t, stride_v, stride_t, stride_v),
+                      writeable=False)
 
 
-def data_gen(file_path, n_frame=24):
+def data_gen(file_path, n_frame=24, cache_path=None):
     '''
     Source file load and dataset generation.
 
@@ -57,15 +62,38 @@ def data_gen(file_path, n_frame=24):
 
     n_frame: int, n_his + n_pred
 
+    cache_path: str, default None, path of an npz file that stores the
+                normalized dataset, it is reused only if it was built from
+                the same file_path (absolute path, size and mtime) with
+                the same n_frame, otherwise it is rebuilt
+
     Returns
     ----------
     Dataset, dataset that contains training, validation and test with stats.
 
     '''
 
-    with open(file_path, 'r') as f:
-        reader = csv.reader(f)
-        data_seq = np.array([list(map(float, i)) for i in reader if i])
+    file_stat = os.stat(file_path)
+    source = {'source': os.path.abspath(file_path),
+              'size': file_stat.st_size,
+              'mtime': file_stat.st_mtime,
+              'n_frame': n_frame}
+
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            # open the file here so that it is closed even if np.load fails
+            with open(cache_path, 'rb') as fh, np.load(fh) as f:
+                if all(f[key][()] == value for key, value in source.items()):
+                    x_data = {'train': f['train'], 'val': f['val'],
+                              'test': f['test']}
+                    x_stats = {'mean': f['mean'][()], 'std': f['std'][()]}
+                    return Dataset(x_data, x_stats)
+        except (zipfile.BadZipFile, KeyError):
+            # truncated or outdated cache, rebuild it below
+            pass
+
+    data_seq = np.loadtxt(file_path, delimiter=',', ndmin=2,
+                          dtype=np.float32)
 
     num_of_samples = data_seq.shape[0]
     splitting_line1 = int(num_of_samples * 0.6)
@@ -75,8 +103,9 @@ def data_gen(file_path, n_frame=24):
     seq_val = seq_gen(data_seq[splitting_line1: splitting_line2], n_frame)
     seq_test = seq_gen(data_seq[splitting_line2:], n_frame)
 
-    mean = np.mean(seq_train)
-    std = np.std(seq_train)
+    # accumulate the statistics in float64 to keep them precise
+    mean = np.mean(seq_train, dtype=np.float64)
+    std = np.std(seq_train, dtype=np.float64)
     x_stats = {'mean': mean, 'std': std}
 
     x_train = z_score(seq_train, mean, std)
@@ -85,4 +114,21 @@ def data_gen(file_path, n_frame=24):
 
     x_data = {'train': x_train, 'val': x_val, 'test': x_test}
     dataset = Dataset(x_data, x_stats)
+
+    if cache_path is not None:
+        # write to a temporary file first so that an interrupted run
+        # never leaves a truncated cache behind
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(cache_path)))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **source, **x_data, **x_stats)
+            # mkstemp creates the file as 0600, apply the usual umask mode
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
     return dataset
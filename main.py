@@ -12,6 +12,15 @@ from model.trainer import model_train
 
 ctx = mx.gpu(0)
 
+
+def positive_int(value):
+    value = int(value)
+    if value < 1:
+        raise argparse.ArgumentTypeError(
+            '{} is not a positive integer'.format(value))
+    return value
+
+
 parser = argparse.ArgumentParser()
 parser.add_argument('--num_of_vertices', type=int, default=228)
 parser.add_argument('--n_his', type=int, default=12)
@@ -19,15 +28,18 @@ parser.add_argument('--n_pred', type=int, default=12)
 parser.add_argument('--batch_size', type=int, default=50)
 parser.add_argument('--epochs', type=int, default=50)
 parser.add_argument('--save', type=int, default=10)
+parser.add_argument('--eval_every', type=positive_int, default=1)
 parser.add_argument('--order_of_cheb', type=int, default=3)
 parser.add_argument('--kt', type=int, default=3)
 parser.add_argument('--lr', type=float, default=1e-3)
 parser.add_argument('--opt', type=str, default='adam')
 parser.add_argument('--keep_prob', type=float, default=1.0)
+parser.add_argument('--num_workers', type=int, default=0)
 parser.add_argument('--adj_path', type=str,
                     default='datasets/PeMSD7_W_228.csv')
 parser.add_argument('--time_series_path', type=str,
                     default='datasets/PeMSD7_V_228.csv')
+parser.add_argument('--cache_path', type=str, default=None)
 
 args = parser.parse_args()
 print('Training configs: {}'.format(args))
@@ -44,7 +56,8 @@ L = math_graph.scaled_laplacian(adj)
 cheb_polys = nd.array(math_graph.cheb_poly_approx(L, order_of_cheb))
 
 # Data Preprocessing
-PeMS_dataset = data_utils.data_gen(args.time_series_path, n_his + n_pred)
+PeMS_dataset = data_utils.data_gen(args.time_series_path, n_his + n_pred,
+                                   args.cache_path)
 print('>> Loading dataset with Mean: {0:.2f}, STD: {1:.2f}'.format(
     PeMS_dataset.mean,
     PeMS_dataset.std
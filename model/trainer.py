@@ -3,7 +3,6 @@
 import time
 import os
 
-import numpy as np
 import mxnet as mx
 from mxnet import nd
 from mxnet import gluon
@@ -43,11 +42,10 @@ def model_train(blocks, args, dataset, cheb_polys, ctx, logdir='./logdir'):
     batch_size, epochs = args.batch_size, args.epochs
     opt = args.opt
     keep_prob = args.keep_prob
+    num_workers = args.num_workers
 
     # data
-    train = dataset['train'].transpose((0, 3, 1, 2))
-    val = dataset['val'].transpose((0, 3, 1, 2))
-    test = dataset['test'].transpose((0, 3, 1, 2))
+    train, val, test = dataset['train'], dataset['val'], dataset['test']
 
     train_x, train_y = train[:, :, : n_his, :], train[:, :, n_his:, :]
     val_x, val_y = val[:, :, : n_his, :], val[:, :, n_his:, :]
@@ -56,26 +54,37 @@ def model_train(blocks, args, dataset, cheb_polys, ctx, logdir='./logdir'):
     print(train_x.shape, train_y.shape, val_x.shape,
           val_y.shape, test_x.shape, test_y.shape)
 
+    # batches are staged in page-locked memory so that copies to gpu are async
+    pin_memory = ctx.device_type == 'gpu'
+
+    # training windows are kept whole, each batch is split into
+    # the n_pred (input, target) pairs on the device
     train_loader = gluon.data.DataLoader(
-        gluon.data.ArrayDataset(nd.array(train_x), nd.array(train_y)),
+        gluon.data.ArrayDataset(nd.array(train)),
         batch_size=batch_size,
-        shuffle=False
+        shuffle=False,
+        num_workers=num_workers,
+        pin_memory=pin_memory
     )
-    val_loader = gluon.data.DataLoader(
+
+    # val and test batches never change between epochs,
+    # so they are collected once instead of re-iterating a loader per epoch;
+    # loading them in the main process keeps a single pool of workers
+    val_loader = list(gluon.data.DataLoader(
         gluon.data.ArrayDataset(nd.array(val_x), nd.array(val_y)),
         batch_size=batch_size,
-        shuffle=False
-    )
-    test_loader = gluon.data.DataLoader(
+        shuffle=False,
+        pin_memory=pin_memory
+    ))
+    test_loader = list(gluon.data.DataLoader(
         gluon.data.ArrayDataset(nd.array(test_x), nd.array(test_y)),
         batch_size=batch_size,
-        shuffle=False
-    )
+        shuffle=False,
+        pin_memory=pin_memory
+    ))
 
-    ground_truth = (np.concatenate([y.asnumpy() for x, y in test_loader],
-                                   axis=0) *
-                    dataset.std +
-                    dataset.mean)
+    ground_truth = utils.math_utils.z_inverse(test_y, dataset.mean,
+                                              dataset.std)
 
     # model
     model = hybrid_model.STGCN(n_his=n_his,
@@ -86,10 +95,7 @@ def model_train(blocks, args, dataset, cheb_polys, ctx, logdir='./logdir'):
                                num_of_vertices=num_of_vertices,
                                cheb_polys=cheb_polys)
     model.initialize(ctx=ctx, init=mx.init.Xavier())
-    model.hybridize()
-
-    # loss function
-    loss = gluon.loss.L2Loss()
+    model.hybridize(static_alloc=True, static_shape=True)
 
     # trainer
     trainer = gluon.Trainer(model.collect_params(), args.opt)
@@ -100,42 +106,52 @@ def model_train(blocks, args, dataset, cheb_polys, ctx, logdir='./logdir'):
 
     sw = SummaryWriter(logdir=logdir, flush_secs=5)
     train_step = 0
-    val_step = 0
-
-    for epoch in range(epochs):
-        start_time = time.time()
-        for x, y in train_loader:
-            tmp = nd.concat(x, y, dim=2)
-            for pred_idx in range(n_pred):
-                end_idx = pred_idx + n_his
-                x_ = tmp[:, :, pred_idx: end_idx, :]
-                y_ = tmp[:, :, end_idx: end_idx + 1, :]
-                with autograd.record():
-                    l = loss(model(x_.as_in_context(ctx)),
-                             y_.as_in_context(ctx))
-                l.backward()
-                sw.add_scalar(tag='training_loss',
-                              value=l.mean().asscalar(),
+
+    # events are buffered by the writer and flushed on close,
+    # also when training is interrupted
+    try:
+        for epoch in range(epochs):
+            start_time = time.time()
+            train_loss_list = []
+            for batch in train_loader:
+                tmp = batch.as_in_context(ctx)
+                for pred_idx in range(n_pred):
+                    end_idx = pred_idx + n_his
+                    x_ = tmp[:, :, pred_idx: end_idx, :]
+                    y_ = tmp[:, :, end_idx: end_idx + 1, :]
+                    with autograd.record():
+                        # per sample mean squared error
+                        l = nd.square(model(x_) - y_).mean(axis=0,
+                                                           exclude=True)
+                    l.backward()
+                    train_loss_list.append(l.mean())
+                    trainer.step(tmp.shape[0])
+
+            # synchronize with the device once per epoch
+            for l in nd.concat(*train_loss_list, dim=0).asnumpy():
+                sw.add_scalar(tag='training_loss', value=l,
                               global_step=train_step)
-                trainer.step(x.shape[0])
                 train_step += 1
 
-        val_loss_list = []
-        for x, y in val_loader:
-            pred = predict_batch(model, ctx, x, n_pred)
-            val_loss_list.append(loss(pred, y).mean().asscalar())
-        sw.add_scalar(tag='val_loss',
-                      value=sum(val_loss_list) / len(val_loss_list),
-                      global_step=val_step)
-
-        evaluate(model, ctx, ground_truth, test_loader, n_pred,
-                 dataset.mean, dataset.std, sw, val_step)
-        val_step += 1
+            # validation and testing are run every eval_every epochs
+            # and always after the last one
+            if (epoch + 1) % args.eval_every == 0 or epoch == epochs - 1:
+                val_loss_list = []
+                for x, y in val_loader:
+                    pred = predict_batch(model, ctx, x, n_pred)
+                    val_loss_list.append(nd.square(pred - y).mean())
+                val_loss = nd.concat(*val_loss_list, dim=0).mean().asscalar()
+                sw.add_scalar(tag='val_loss', value=val_loss,
+                              global_step=epoch)
 
-        if (epoch + 1) % args.save == 0:
-            model.save_parameters('params/{}.params'.format(epoch + 1))
+                evaluate(model, ctx, ground_truth, test_loader, n_pred,
+                         dataset.mean, dataset.std, sw, epoch)
 
-    sw.close()
+            if (epoch + 1) % args.save == 0:
+                model.save_parameters(
+                    'params/{}.params'.format(epoch + 1))
+    finally:
+        sw.close()
 
 
 def predict_batch(model, ctx, x, n_pred):
@@ -148,12 +164,12 @@ def predict_batch(model, ctx, x, n_pred):
     ----------
     mx.ndarray, shape is (batch_size, 1, n_pred, num_of_vertices)
     '''
+    x = x.as_in_context(ctx)
     predicts = []
     for pred_idx in range(n_pred):
         x_input = nd.concat(x, *predicts, dim=2)[:, :, - n_pred:, :]
-        predicts.append(model(x_input.as_in_context(ctx))
-                        .as_in_context(mx.cpu()))
-    return nd.concat(*predicts, dim=2)
+        predicts.append(model(x_input))
+    return nd.concat(*predicts, dim=2).as_in_context(mx.cpu())
 
 
 def predict(model, ctx, data_loader, n_pred):
@@ -183,7 +199,7 @@ def evaluate(model, ctx, ground_truth, test_loader,
     ground_truth: np.ndarray,
                   shape is (num_of_samples, 1, n_pred, num_of_vertices)
 
-    test_loader: gluon.data.DataLoader, contains x and y
+    test_loader: gluon.data.DataLoader or list, batches of x and y
 
     n_pred: int
 
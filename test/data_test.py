@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import numpy as np
+
+
+class Test(unittest.TestCase):
+
+    def test_seq_gen(self):
+
+        from data_loader.data_utils import seq_gen
+
+        data_seq = np.random.uniform(size=(50, 7))
+        data = seq_gen(data_seq, 24)
+
+        self.assertEqual(data.shape, (27, 1, 24, 7))
+        for i in range(data.shape[0]):
+            np.testing.assert_array_equal(data[i, 0, :, :],
+                                          data_seq[i: i + 24, :])
+
+    def test_data_gen_cache(self):
+
+        from data_loader.data_utils import data_gen
+        import os
+        import shutil
+        import tempfile
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        file_a = os.path.join(tmp_dir, 'a.csv')
+        file_b = os.path.join(tmp_dir, 'b.csv')
+        cache_path = os.path.join(tmp_dir, 'V.cache')
+        np.savetxt(file_a, np.random.uniform(size=(200, 7)), delimiter=',')
+        np.savetxt(file_b, np.random.uniform(size=(300, 9)), delimiter=',')
+        os.utime(file_b, (1000, 1000))
+
+        dataset = data_gen(file_a, 24, cache_path)
+        self.assertEqual(dataset['train'].shape, (97, 1, 24, 7))
+
+        # the cache gets the same permissions as any newly created file
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(cache_path).st_mode & 0o777,
+                         0o666 & ~umask)
+
+        # plant a sentinel in the cache, it must be returned as is
+        with np.load(cache_path) as f:
+            content = dict(f)
+        content['train'] = np.zeros((1, 1, 24, 7), dtype=np.float32)
+        with open(cache_path, 'wb') as f:
+            np.savez(f, **content)
+        self.assertEqual(data_gen(file_a, 24, cache_path)['train'].shape,
+                         (1, 1, 24, 7))
+
+        # a different n_frame, mtime or source file rebuilds the cache
+        self.assertEqual(data_gen(file_a, 12, cache_path)['train'].shape,
+                         (109, 1, 12, 7))
+        data_gen(file_a, 24, cache_path)
+        with open(cache_path, 'wb') as f:
+            np.savez(f, **content)
+        os.utime(file_a, (2000, 2000))
+        np.testing.assert_array_equal(
+            data_gen(file_a, 24, cache_path)['train'], dataset['train'])
+        self.assertEqual(data_gen(file_b, 24, cache_path)['train'].shape,
+                         (157, 1, 24, 9))
+
+        # a truncated cache is rebuilt instead of failing
+        with open(cache_path, 'rb') as f:
+            head = f.read(100)
+        with open(cache_path, 'wb') as f:
+            f.write(head)
+        np.testing.assert_array_equal(
+            data_gen(file_a, 24, cache_path)['train'], dataset['train'])
+        with np.load(cache_path) as f:
+            np.testing.assert_array_equal(f['train'], dataset['train'])
+
+if __name__ == '__main__':
+    unittest.main()
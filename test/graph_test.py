@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import numpy as np
+
+
+class Test(unittest.TestCase):
+
+    def test_cheb_poly_approx(self):
+
+        from utils.math_graph import cheb_poly_approx
+
+        num_of_vertices = 100
+        L_dense = np.random.uniform(size=(num_of_vertices, num_of_vertices))
+        # symmetric tridiagonal, about 3% dense, takes the csr path
+        off_diag = np.random.uniform(size=num_of_vertices - 1)
+        L_sparse = np.diag(np.random.uniform(size=num_of_vertices)) + \
+            np.diag(off_diag, 1) + np.diag(off_diag, -1)
+
+        for L in (L_dense, L_sparse):
+            cheb_polys = cheb_poly_approx(L, 3)
+            self.assertEqual(cheb_polys.shape,
+                             (num_of_vertices, 3 * num_of_vertices))
+            np.testing.assert_allclose(
+                cheb_polys[:, 2 * num_of_vertices:],
+                2 * L.dot(L) - np.identity(num_of_vertices),
+                rtol=1e-5, atol=1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
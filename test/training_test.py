@@ -54,7 +54,7 @@ class Test(unittest.TestCase):
             PeMS_dataset.std
         ))
 
-        test = PeMS_dataset['test'].transpose((0, 3, 1, 2))
+        test = PeMS_dataset['test']
         test_x, test_y = test[:100, :, : 12, :], test[:100, :, 12:, :]
         test_loader = gluon.data.DataLoader(
             gluon.data.ArrayDataset(nd.array(test_x), nd.array(test_y)),
@@ -1,10 +1,9 @@
 # -*- coding:utf-8 -*-
 
-import csv
-
 import numpy as np
 
-from scipy.sparse.linalg import eigs
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import eigsh
 
 
 def scaled_laplacian(W):
@@ -25,12 +24,12 @@ def scaled_laplacian(W):
     num_of_vertices = W.shape[0]
     d = np.sum(W, axis=1)
     L = np.diag(d) - W
-    for i in range(num_of_vertices):
-        for j in range(num_of_vertices):
-            if (d[i] > 0) and (d[j] > 0):
-                L[i, j] = L[i, j] / np.sqrt(d[i] * d[j])
+    # normalize the rows and columns of vertices with positive degree
+    idx = np.ix_(d > 0, d > 0)
+    L[idx] = L[idx] / np.sqrt(np.outer(d, d))[idx]
     # lambda_max \approx 2.0, the largest eigenvalues of L.
-    lambda_max = eigs(L, k=1, which='LR')[0][0].real
+    # L is symmetric, so the Lanczos solver is enough.
+    lambda_max = eigsh(L, k=1, which='LA', return_eigenvectors=False)[0]
     return 2 * L / lambda_max - np.identity(num_of_vertices)
 
 
@@ -45,19 +44,33 @@ def cheb_poly_approx(L, order_of_cheb):
 
     Returns
     ----------
-    np.ndarray, shape is (num_of_vertices, order_of_cheb * num_of_vertices)
+    np.ndarray, float32,
+                shape is (num_of_vertices, order_of_cheb * num_of_vertices)
 
     '''
 
-    if order_of_cheb == 1:
-        return np.identity(L.shape[0])
+    num_of_vertices = L.shape[0]
+
+    # polynomials are written side by side into one float32 buffer,
+    # so Gconv multiplies by all orders with a single dot
+    cheb_polys = np.empty((num_of_vertices, order_of_cheb * num_of_vertices),
+                          dtype=np.float32)
+    polys = np.split(cheb_polys, order_of_cheb, axis=1)
+
+    polys[0][...] = np.identity(num_of_vertices)
+    if order_of_cheb > 1:
+        polys[1][...] = L
 
-    cheb_polys = [np.identity(L.shape[0]), L]
+    # the thresholded graph is usually very sparse,
+    # then the recursion only needs sparse-dense products
+    if np.count_nonzero(L) < 0.05 * L.size:
+        L = csr_matrix(L)
 
+    # T_k(L) = 2 L T_{k-1}(L) - T_{k-2}(L)
     for i in range(2, order_of_cheb):
-        cheb_polys.append(2 * L * cheb_polys[i - 1] - cheb_polys[i - 2])
+        polys[i][...] = 2 * L.dot(polys[i - 1]) - polys[i - 2]
 
-    return np.concatenate(cheb_polys, axis=-1)
+    return cheb_polys
 
 
 def first_approx(adj):
@@ -100,9 +113,7 @@ def weight_matrix(file_path, sigma2=0.1, epsilon=0.5, scaling=True):
     np.ndarray, shape is (num_of_vertices, num_of_vertices)
 
     '''
-    with open(file_path, 'r') as f:
-        reader = csv.reader(f)
-        adj = np.array([list(map(float, i)) for i in reader if i])
+    adj = np.loadtxt(file_path, delimiter=',', ndmin=2)
 
     # check whether adj is a 0/1 matrix.
     if set(np.unique(adj)) == {0, 1}:
@@ -110,9 +121,11 @@ def weight_matrix(file_path, sigma2=0.1, epsilon=0.5, scaling=True):
         scaling = False
 
     if scaling:
-        adj = adj / 10
-        mask = np.ones_like(adj) - np.identity(adj.shape[0])
-        # refer to Eq.10
-        exp = np.exp(- adj ** 2 / sigma2)
-        return exp * (exp >= epsilon) * mask
+        # refer to Eq.10, computed in place on the loaded matrix
+        adj /= 10
+        np.square(adj, out=adj)
+        adj /= - sigma2
+        np.exp(adj, out=adj)
+        adj[adj < epsilon] = 0
+        np.fill_diagonal(adj, 0)
     return adj
@@ -17,11 +17,13 @@ def z_score(x, mean, std):
 
     Returns
     ----------
-    np.ndarray
+    np.ndarray, float32
 
     '''
 
-    return (x - mean) / std
+    out = np.subtract(x, mean, dtype=np.float32)
+    np.divide(out, std, out=out)
+    return out
 
 
 def z_inverse(x, mean, std):